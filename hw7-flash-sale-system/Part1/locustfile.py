@@ -1,17 +1,93 @@
-from locust import HttpUser, task, between, events
+"""
+HW7 Part 1 Load Test - synchronous order endpoint
+
+Latency is exported as a Prometheus textfile (PROM_TEXTFILE, default
+/tmp/locust.prom) when the test stops. Each process writes its own file:
+distributed workers write <name>.worker<N>.prom and the master writes
+nothing, so aggregate the per-worker files (e.g. node_exporter's textfile
+collector or a sum in PromQL) rather than expecting one combined file.
+"""
+
+from locust import FastHttpUser, task, between, events
+from locust.runners import MasterRunner, WorkerRunner
+from locust_plugins.connection_pools import FastHttpPool
+from geventhttpclient.client import HTTPClientPool
+from prometheus_client import CollectorRegistry, Histogram, write_to_textfile
+import os
 import random
+import socket
 import json
-import time
 
-class OrderUser(HttpUser):
+# Parse responses and print order ids (debugging only; costs a JSON parse per request)
+LOG_ORDER_IDS = os.environ.get("LOG_ORDER_IDS", "").lower() in ("1", "true", "yes")
+
+
+# Connection helpers below are kept identical in Part1/locustfile.py and
+# testing/locustfile.py (each locustfile runs standalone from its own
+# directory); change both together.
+
+
+def set_socket_options(sock):
+    """Disable Nagle so small order POSTs aren't held back by delayed ACKs"""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+
+class NoDelayClientPool(HTTPClientPool):
+    """HTTPClientPool whose connections are opened with TCP_NODELAY"""
+
+    def get_client(self, url):
+        client = super().get_client(url)
+        # Clients are cached per host:port; install the hook only when the
+        # client is new (after_connect is still the class method)
+        connections = client._connection_pool
+        if "after_connect" not in vars(connections):
+            connections.after_connect = set_socket_options
+        return client
+
+
+def pooled_client(user):
+    """FastHttpPool of TCP_NODELAY sessions for one user.
+
+    The pool does not add concurrency: a user runs its tasks one at a time,
+    so it just rotates requests round-robin over --pool_size / POOL_SIZE
+    connections (a locust_plugins option, defaulted to 8 below). That spreads one user's traffic
+    over more source ports, e.g. across load balancer targets, at the cost of
+    holding more sockets open.
+
+    Relies on FastHttpPool._pool (locust-plugins 5.x) and on the user
+    agent's clientpool attribute (geventhttpclient 2.x), neither of which
+    is public API.
+    """
+    pool = FastHttpPool(user=user)
+    for session in pool._pool:
+        agent = session.client
+        agent.clientpool = NoDelayClientPool(**agent.clientpool.client_args)
+    return pool
+
+
+@events.init_command_line_parser.add_listener
+def default_pool_size(parser):
+    # Runs after locust_plugins adds --pool_size; the flag and env var still win.
+    parser.set_defaults(pool_size=8)
+
+
+class OrderUser(FastHttpUser):
     """Simulates a customer placing orders"""
     
     # Wait time between requests (100-500ms as specified)
     wait_time = between(0.1, 0.5)
     
+    # 10 second timeout to catch hung requests
+    network_timeout = 10
+    connection_timeout = 10
+    
     def on_start(self):
         """Called when a simulated user starts"""
+        self.client = pooled_client(self)
         self.customer_id = random.randint(1000, 9999)
+        # Per-user generator: no shared module-level state between greenlets
+        self.rng = random.Random(self.customer_id)
         print(f"👤 Customer {self.customer_id} started shopping")
     
     @task
@@ -19,49 +95,80 @@ class OrderUser(HttpUser):
         """Place an order using synchronous endpoint"""
         
         # Generate random order
+        n = self.rng.randint(1, 3)
+        product_ids = self.rng.choices(range(100, 1000), k=n)
+        quantities = self.rng.choices(range(1, 6), k=n)
         order = {
             "customer_id": self.customer_id,
             "items": [
                 {
-                    "product_id": f"PROD-{random.randint(100, 999)}",
-                    "quantity": random.randint(1, 5),
-                    "price": round(random.uniform(10.0, 100.0), 2)
+                    "product_id": f"PROD-{product_id}",
+                    "quantity": quantity,
+                    "price": round(self.rng.random() * 90 + 10, 2)
                 }
-                for _ in range(random.randint(1, 3))
+                for product_id, quantity in zip(product_ids, quantities)
             ]
         }
         
-        start_time = time.time()
-        
-        # Make request with timeout to catch hung requests
         with self.client.post(
             "/orders/sync",
             json=order,
-            catch_response=True,
-            timeout=10  # 10 second timeout
+            catch_response=True
         ) as response:
             
-            duration = time.time() - start_time
+            duration = response.request_meta["response_time"] / 1000
             
             if response.status_code == 200:
-                result = response.json()
-                print(f"✅ Order {result.get('order_id', 'unknown')} completed in {duration:.2f}s")
+                if LOG_ORDER_IDS:
+                    result = response.json()
+                    print(f"✅ Order {result.get('order_id', 'unknown')} completed in {duration:.2f}s")
                 response.success()
             
             elif response.status_code == 402:  # Payment failed
-                result = response.json()
-                print(f"❌ Payment declined: {result.get('order_id', 'unknown')}")
-                response.failure(f"Payment declined")
+                if LOG_ORDER_IDS:
+                    result = response.json()
+                    print(f"❌ Payment declined: {result.get('order_id', 'unknown')}")
+                response.failure("Payment declined")
             
             elif response.status_code == 504 or duration > 9:  # Timeout
-                print(f"⏱️  Request timeout after {duration:.2f}s - system overloaded!")
                 response.failure("Request timeout - system overloaded")
             
             else:
-                print(f"⚠️  Unexpected response: {response.status_code}")
                 response.failure(f"Unexpected status: {response.status_code}")
 
 
+# Latency histogram (ms buckets), aggregated in memory and exported once at
+# test stop as a Prometheus textfile instead of being printed
+BINS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+PROM_TEXTFILE = os.environ.get("PROM_TEXTFILE", "/tmp/locust.prom")
+REGISTRY = CollectorRegistry()
+ORDER_LATENCY = Histogram(
+    "order_latency_ms", "Order request latency in milliseconds",
+    ["status"], buckets=BINS, registry=REGISTRY,
+)
+
+
+# Kept identical in Part1/locustfile.py and testing/locustfile.py
+def prom_textfile_path(runner):
+    """Per-process textfile path, or None on a master (it holds no samples).
+
+    Workers append their index so processes sharing a host don't overwrite
+    each other; a standalone run writes PROM_TEXTFILE itself.
+    """
+    if isinstance(runner, MasterRunner):
+        return None
+    if isinstance(runner, WorkerRunner):
+        root, ext = os.path.splitext(PROM_TEXTFILE)
+        return f"{root}.worker{runner.worker_index}{ext}"
+    return PROM_TEXTFILE
+
+
+@events.request.add_listener
+def on_request(response_time, response=None, **kwargs):
+    status = getattr(response, "status_code", 0) or "error"
+    ORDER_LATENCY.labels(status=status).observe(response_time)
+
+
 # Custom event handlers for better reporting
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
@@ -79,25 +186,12 @@ def on_test_start(environment, **kwargs):
 
 @events.test_stop.add_listener
 def on_test_stop(environment, **kwargs):
-    print("\n" + "="*60)
-    print("🏁 LOAD TEST COMPLETE")
-    print("="*60)
-    
-    stats = environment.stats.total
-    print(f"\n📊 Summary:")
-    print(f"  Total Requests:    {stats.num_requests}")
-    print(f"  Failures:          {stats.num_failures} ({stats.fail_ratio*100:.1f}%)")
-    print(f"  Average Response:  {stats.avg_response_time:.0f}ms")
-    print(f"  Min Response:      {stats.min_response_time:.0f}ms")
-    print(f"  Max Response:      {stats.max_response_time:.0f}ms")
-    print(f"  RPS:               {stats.total_rps:.2f}")
-    
-    if stats.num_failures > 0:
-        print(f"\n⚠️  {stats.num_failures} requests failed!")
-        print("This is expected during flash sale simulation.")
-        print("The synchronous system cannot handle 60 orders/second.")
-    
-    print("="*60 + "\n")
+    path = prom_textfile_path(environment.runner)
+    if path is None:
+        return
+    # Atomic write (temp file + rename), safe for node_exporter's textfile collector
+    write_to_textfile(path, REGISTRY)
+    print(f"\n🏁 LOAD TEST COMPLETE - latency histogram written to {path}\n")
 
 
 # Test scenario configurations
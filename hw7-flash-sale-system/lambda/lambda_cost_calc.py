@@ -40,43 +40,98 @@ Response body:
 }
 
 Notes:
-- Uses Decimal to avoid floating point issues.
+- Money is held as integer cents; inputs are parsed exactly from their decimal
+  text (never via float), and rounding is HALF_UP to the cent.
 - Strict validation with clear error messages.
 - Works with API Gateway proxy (stringified body) or direct Lambda invoke (dict body).
 """
 from __future__ import annotations
 
 import json
-import math
-from decimal import Decimal, ROUND_HALF_UP, getcontext
-from typing import Any, Dict, List, Tuple
+from decimal import Decimal, InvalidOperation
+from fractions import Fraction
+from typing import Annotated, Any, Dict, List, Tuple, Union
 
-# Configure money math: 2 decimal places, bankers rounding avoided (use HALF_UP)
-getcontext().prec = 28
+# orjson is several times faster for the per-invoke parse/serialize; fall back
+# to the stdlib when it is not bundled with the deployment package
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
 
-TWO_PLACES = Decimal("0.01")
+# msgspec validates a well-formed order in one C call; anything it rejects
+# falls back to the hand-written validation below for the error message
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+# Largest decimal exponent handled exactly on the slow parse path; Fraction
+# would otherwise build 10**exp in full for inputs like "1e-20000000"
+MAX_EXPONENT = 30
 
 
 class BadRequest(ValueError):
     pass
 
 
-def d(val: Any) -> Decimal:
-    """Coerce val into Decimal safely."""
-    if isinstance(val, Decimal):
-        return val
+def ratio(val: Any) -> Tuple[int, int]:
+    """Parse val exactly into (numerator, denominator), denominator > 0."""
+    # Convert bool -> int to avoid True==1 corner cases
+    if isinstance(val, bool):
+        val = int(val)
+    if isinstance(val, int):
+        return val, 1
+    text = str(val)
+    # Fast path for plain decimals such as "29.99", "-5" or ".5"
+    whole, _, frac = text.partition(".")
+    if not frac or frac.isdecimal():
+        try:
+            return int(whole + frac), 10 ** len(frac)
+        except ValueError:
+            pass
+    # Slow path for exponents/whitespace ("1e-05", " 3.5"). Decimal parses the
+    # exponent without expanding it, so out-of-range values are rejected cheaply
     try:
-        # Convert bool -> int -> str to avoid True==1 corner cases in Decimal
-        if isinstance(val, bool):
-            val = int(val)
-        return Decimal(str(val))
-    except Exception as e:
+        dec = Decimal(text)
+    except (InvalidOperation, ValueError) as e:
         raise BadRequest(f"Invalid numeric value: {val!r}") from e
+    if not dec.is_finite() or dec.adjusted() > MAX_EXPONENT:
+        raise BadRequest(f"Invalid numeric value: {val!r}")
+    if dec.adjusted() < -MAX_EXPONENT:
+        # Rounds to 0 cents / 0 tax at any realistic magnitude; a negative
+        # value keeps a tiny negative stand-in so the ">= 0" checks still fire
+        return (-1, 10 ** (MAX_EXPONENT + 1)) if dec < 0 else (0, 1)
+    f = Fraction(dec)
+    return f.numerator, f.denominator
+
+
+def div_half_up(num: int, den: int) -> int:
+    """Integer num / den (den > 0) rounded HALF_UP, i.e. half away from zero."""
+    n = (abs(num) * 2 + den) // (den * 2)
+    return n if num >= 0 else -n
+
 
+def ratio_to_cents(num: int, den: int) -> int:
+    """Convert num / den to integer cents; only values with > 2 dp need rounding."""
+    if 100 % den == 0:
+        return num * (100 // den)
+    return div_half_up(num * 100, den)
 
-def q(val: Decimal) -> Decimal:
-    """Quantize to 2 dp using HALF_UP."""
-    return val.quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+def cents(val: Any) -> int:
+    """Coerce val into integer cents, rounding HALF_UP."""
+    return ratio_to_cents(*ratio(val))
+
+
+def fmt(c: int) -> str:
+    """Format integer cents as a 2 dp string."""
+    whole, frac = divmod(abs(c), 100)
+    return f"{'-' if c < 0 else ''}{whole}.{frac:02d}"
+
+
+_MISSING = object()
 
 
 def parse_event(event: Dict[str, Any]) -> Dict[str, Any]:
@@ -84,20 +139,25 @@ def parse_event(event: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(event, dict):
         raise BadRequest("Event must be a JSON object")
 
-    body = event
-    # API Gateway HTTP API / REST API often wraps under "body"
-    if "body" in event:
-        raw = event["body"]
-        if raw is None:
-            body = {}
-        elif isinstance(raw, (bytes, bytearray)):
-            body = json.loads(raw.decode("utf-8"))
-        elif isinstance(raw, str):
+    # API Gateway HTTP API / REST API often wraps under "body"; a direct
+    # invoke passes the body itself
+    raw = event.get("body", _MISSING)
+    if raw is _MISSING:
+        return event
+    if isinstance(raw, dict):
+        return raw
+
+    if raw is None:
+        body = {}
+    elif isinstance(raw, (bytes, bytearray, str)):
+        try:
+            body = _json.loads(raw)
+        except ValueError:
+            # Retry with the stdlib for input orjson is stricter about
+            # (big integers, lone surrogates); genuinely bad JSON fails again
             body = json.loads(raw)
-        elif isinstance(raw, dict):
-            body = raw
-        else:
-            raise BadRequest("Unsupported body type")
+    else:
+        raise BadRequest("Unsupported body type")
 
     if not isinstance(body, dict):
         raise BadRequest("Request body must be a JSON object")
@@ -105,6 +165,56 @@ def parse_event(event: Dict[str, Any]) -> Dict[str, Any]:
     return body
 
 
+if msgspec is not None:
+    NonNegInt = Annotated[int, msgspec.Meta(ge=0)]
+    NonNegFloat = Annotated[float, msgspec.Meta(ge=0)]
+
+    class Item(msgspec.Struct):
+        sku: str
+        quantity: NonNegInt
+        unit_price: Union[NonNegInt, NonNegFloat]
+
+    class Order(msgspec.Struct):
+        items: Annotated[List[Item], msgspec.Meta(min_length=1)]
+        currency: Any = "USD"
+        discounts: Any = None
+        shipping: Any = None
+        tax: Any = None
+
+    _order_decoder = msgspec.json.Decoder(Order)
+
+
+def parse_order(event: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Return (body, validated items), trying the msgspec fast path first."""
+    if msgspec is not None and isinstance(event, dict):
+        raw = event.get("body", event)
+        try:
+            if isinstance(raw, (bytes, bytearray, str)):
+                order = _order_decoder.decode(raw)
+            elif isinstance(raw, dict):
+                order = msgspec.convert(raw, Order)
+            else:
+                order = None
+        except msgspec.MsgspecError:
+            order = None
+        if order is not None:
+            items = [
+                {"sku": it.sku.strip(), "quantity": it.quantity, "unit_price": cents(it.unit_price)}
+                for it in order.items
+            ]
+            if all(it["sku"] for it in items):
+                body = {
+                    "currency": order.currency,
+                    "discounts": order.discounts,
+                    "shipping": order.shipping,
+                    "tax": order.tax,
+                }
+                return body, items
+
+    body = parse_event(event)
+    return body, validate_items(body.get("items"))
+
+
 def validate_items(items: Any) -> List[Dict[str, Any]]:
     if not isinstance(items, list) or not items:
         raise BadRequest("'items' must be a non-empty list")
@@ -124,36 +234,41 @@ def validate_items(items: Any) -> List[Dict[str, Any]]:
             raise BadRequest(f"Item '{sku}': 'quantity' must be an integer")
         if qty_i < 0:
             raise BadRequest(f"Item '{sku}': 'quantity' must be >= 0")
-        price_d = d(price)
-        if price_d < 0:
+        num, den = ratio(price)
+        if num < 0:
             raise BadRequest(f"Item '{sku}': 'unit_price' must be >= 0")
         cleaned.append({
             "sku": sku.strip(),
             "quantity": qty_i,
-            "unit_price": q(price_d),
+            "unit_price": ratio_to_cents(num, den),
         })
     return cleaned
 
 
-def compute_subtotal(items: List[Dict[str, Any]]) -> Tuple[Decimal, List[Dict[str, Any]]]:
+def scan_items(items: List[Dict[str, Any]]) -> Tuple[int, int, List[Dict[str, Any]]]:
+    """Single pass over items: (subtotal, total quantity, response line items)."""
     lines: List[Dict[str, Any]] = []
-    subtotal = Decimal("0")
+    subtotal = 0
+    total_qty = 0
     for it in items:
-        line = q(d(it["unit_price"]) * d(it["quantity"]))
+        qty = it["quantity"]
+        unit_price = it["unit_price"]
+        line = unit_price * qty
         subtotal += line
+        total_qty += qty
         lines.append({
             "sku": it["sku"],
-            "quantity": it["quantity"],
-            "unit_price": f"{q(d(it['unit_price']))}",
-            "line_subtotal": f"{line}",
+            "quantity": qty,
+            "unit_price": fmt(unit_price),
+            "line_subtotal": fmt(line),
         })
-    return q(subtotal), lines
+    return subtotal, total_qty, lines
 
 
-def compute_discounts(subtotal: Decimal, discounts: Any) -> Decimal:
+def compute_discounts(subtotal: int, discounts: Any) -> int:
     if not discounts:
-        return Decimal("0")
-    total_disc = Decimal("0")
+        return 0
+    total_disc = 0
     if not isinstance(discounts, list):
         raise BadRequest("'discounts' must be a list")
     for idx, disc in enumerate(discounts):
@@ -166,93 +281,111 @@ def compute_discounts(subtotal: Decimal, discounts: Any) -> Decimal:
         if value is None:
             raise BadRequest("Discount missing 'value'")
         if typ == "PERCENT":
-            pct = d(value)
-            if pct < 0:
+            pct_num, pct_den = ratio(value)
+            if pct_num < 0:
                 raise BadRequest("Percent discount must be >= 0")
-            amt = q(subtotal * (pct / Decimal("100")))
+            amt = div_half_up(subtotal * pct_num, pct_den * 100)
         else:  # AMOUNT
-            amt = q(d(value))
+            amt = cents(value)
             if amt < 0:
                 raise BadRequest("Amount discount must be >= 0")
         total_disc += amt
     # Cap discounts at subtotal
-    return q(min(total_disc, subtotal))
+    return min(total_disc, subtotal)
 
 
-def compute_shipping(items: List[Dict[str, Any]], discounted_subtotal: Decimal, shipping: Any) -> Decimal:
+def compute_shipping(total_qty: int, discounted_subtotal: int, shipping: Any) -> int:
     if not shipping:
-        return Decimal("0")
+        return 0
     if not isinstance(shipping, dict):
         raise BadRequest("'shipping' must be an object")
     mode = str(shipping.get("mode", "FLAT")).upper()
-    rate = q(d(shipping.get("rate", 0)))
+    rate = cents(shipping.get("rate", 0))
     if rate < 0:
         raise BadRequest("Shipping 'rate' must be >= 0")
     free_over = shipping.get("free_over")
-    free_over_d = q(d(free_over)) if free_over is not None else None
+    free_over_c = cents(free_over) if free_over is not None else None
 
-    if free_over_d is not None and discounted_subtotal >= free_over_d:
-        return Decimal("0")
+    if free_over_c is not None and discounted_subtotal >= free_over_c:
+        return 0
 
     if mode == "PER_ITEM":
-        total_qty = sum(int(it["quantity"]) for it in items)
-        return q(rate * d(total_qty))
+        return rate * total_qty
     elif mode == "FLAT":
         return rate
     else:
         raise BadRequest("Shipping 'mode' must be 'FLAT' or 'PER_ITEM'")
 
 
-def compute_tax(tax_cfg: Any, taxable_base: Decimal, shipping: Decimal) -> Decimal:
+def compute_tax(tax_cfg: Any, taxable_base: int, shipping: int) -> int:
     if not tax_cfg:
-        return Decimal("0")
+        return 0
     if not isinstance(tax_cfg, dict):
         raise BadRequest("'tax' must be an object")
-    rate_percent = d(tax_cfg.get("rate_percent", 0))
-    if rate_percent < 0:
+    rate_num, rate_den = ratio(tax_cfg.get("rate_percent", 0))
+    if rate_num < 0:
         raise BadRequest("Tax 'rate_percent' must be >= 0")
     apply_on_shipping = bool(tax_cfg.get("apply_on_shipping", False))
 
-    base = taxable_base + (shipping if apply_on_shipping else Decimal("0"))
-    tax = q(base * (rate_percent / Decimal("100")))
+    base = taxable_base + (shipping if apply_on_shipping else 0)
+    tax = div_half_up(base * rate_num, rate_den * 100)
     return tax
 
 
-def build_response(status_code: int, payload: Dict[str, Any]) -> Dict[str, Any]:
-    """Format like API Gateway proxy integration."""
+def dumps(obj: Any) -> str:
+    """JSON-encode obj to str with whichever json module was imported."""
+    try:
+        body = _json.dumps(obj)
+    except TypeError:
+        # orjson rejects integers above 64 bits and lone surrogates
+        return json.dumps(obj)
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    return body
+
+
+# Success bodies always have the same keys in the same order, and every amount
+# is a plain "123.45" string, so only currency and line_items need encoding
+_ORDER_BODY = (
+    '{"currency":%s,"subtotal":"%s","discount":"%s","shipping":"%s",'
+    '"tax":"%s","total":"%s","line_items":%s}'
+)
+
+
+def build_response(status_code: int, payload: Union[Dict[str, Any], str]) -> Dict[str, Any]:
+    """Format like API Gateway proxy integration; payload may be pre-encoded JSON."""
     return {
         "statusCode": status_code,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps(payload),
+        "body": payload if isinstance(payload, str) else dumps(payload),
     }
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     try:
-        body = parse_event(event)
+        body, items = parse_order(event)
         currency = str(body.get("currency", "USD")).upper()
-        items = validate_items(body.get("items"))
 
-        subtotal, line_items = compute_subtotal(items)
+        subtotal, total_qty, line_items = scan_items(items)
         discount = compute_discounts(subtotal, body.get("discounts"))
 
-        discounted_subtotal = q(subtotal - discount)
-        shipping = compute_shipping(items, discounted_subtotal, body.get("shipping"))
+        discounted_subtotal = subtotal - discount
+        shipping = compute_shipping(total_qty, discounted_subtotal, body.get("shipping"))
 
         # By default, tax applies on (subtotal - discount); shipping optional via flag
         tax = compute_tax(body.get("tax"), discounted_subtotal, shipping)
 
-        total = q(discounted_subtotal + shipping + tax)
-
-        response = {
-            "currency": currency,
-            "subtotal": f"{subtotal}",
-            "discount": f"{discount}",
-            "shipping": f"{shipping}",
-            "tax": f"{tax}",
-            "total": f"{total}",
-            "line_items": line_items,
-        }
+        total = discounted_subtotal + shipping + tax
+
+        response = _ORDER_BODY % (
+            dumps(currency),
+            fmt(subtotal),
+            fmt(discount),
+            fmt(shipping),
+            fmt(tax),
+            fmt(total),
+            dumps(line_items),
+        )
         return build_response(200, response)
 
     except BadRequest as e:
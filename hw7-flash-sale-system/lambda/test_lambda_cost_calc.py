@@ -0,0 +1,249 @@
+import json
+import time
+import unittest
+from fractions import Fraction
+from unittest import mock
+
+import lambda_cost_calc
+from lambda_cost_calc import BadRequest, fmt, lambda_handler, msgspec, parse_order, ratio
+
+
+def invoke(body):
+    resp = lambda_handler({"body": json.dumps(body)}, None)
+    return resp["statusCode"], json.loads(resp["body"])
+
+
+def amounts(payload):
+    return {k: payload[k] for k in ("subtotal", "discount", "shipping", "tax", "total")}
+
+
+class MoneyMathTest(unittest.TestCase):
+    """Fixed results carried over from the original Decimal implementation."""
+
+    def test_module_example(self):
+        status, payload = invoke({
+            "items": [
+                {"sku": "LAP-001", "unit_price": 999.99, "quantity": 1},
+                {"sku": "MOU-001", "unit_price": 29.99, "quantity": 2},
+            ],
+            "discounts": [
+                {"type": "PERCENT", "value": 10},
+                {"type": "AMOUNT", "value": 5},
+            ],
+            "shipping": {"mode": "FLAT", "rate": 9.99, "free_over": 1000},
+            "tax": {"rate_percent": 8.875, "apply_on_shipping": False},
+        })
+        self.assertEqual(status, 200)
+        self.assertEqual(amounts(payload), {
+            "subtotal": "1059.97", "discount": "111.00", "shipping": "9.99",
+            "tax": "84.22", "total": "1043.18",
+        })
+        self.assertEqual(payload["line_items"][1], {
+            "sku": "MOU-001", "quantity": 2, "unit_price": "29.99", "line_subtotal": "59.98",
+        })
+
+    def test_prices_round_half_up(self):
+        status, payload = invoke({"items": [
+            {"sku": "A", "quantity": 3, "unit_price": "1.005"},
+            {"sku": "B", "quantity": 1, "unit_price": "2.675"},
+        ]})
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            [(li["unit_price"], li["line_subtotal"]) for li in payload["line_items"]],
+            [("1.01", "3.03"), ("2.68", "2.68")],
+        )
+        self.assertEqual(payload["total"], "5.71")
+
+    def test_per_item_rate_rounds_before_multiplying(self):
+        status, payload = invoke({
+            "items": [{"sku": "A", "quantity": 3, "unit_price": "10"}],
+            "shipping": {"mode": "PER_ITEM", "rate": "0.005"},
+        })
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["shipping"], "0.03")
+        self.assertEqual(payload["total"], "30.03")
+
+    def test_discounts_and_tax_on_shipping(self):
+        status, payload = invoke({
+            "items": [{"sku": "A", "quantity": 2, "unit_price": "19.99"}],
+            "discounts": [
+                {"type": "PERCENT", "value": "12.5"},
+                {"type": "AMOUNT", "value": "1.005"},
+            ],
+            "shipping": {"mode": "FLAT", "rate": "5.00", "free_over": "100"},
+            "tax": {"rate_percent": "8.875", "apply_on_shipping": True},
+        })
+        self.assertEqual(status, 200)
+        self.assertEqual(amounts(payload), {
+            "subtotal": "39.98", "discount": "6.01", "shipping": "5.00",
+            "tax": "3.46", "total": "42.43",
+        })
+
+    def test_free_shipping_over_threshold(self):
+        status, payload = invoke({
+            "items": [{"sku": "A", "quantity": 1, "unit_price": "150"}],
+            "shipping": {"mode": "PER_ITEM", "rate": "2", "free_over": "100"},
+            "tax": {"rate_percent": "7.25"},
+        })
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["shipping"], "0.00")
+        self.assertEqual(payload["tax"], "10.88")
+        self.assertEqual(payload["total"], "160.88")
+
+    def test_discount_capped_and_zeros_render_with_cents(self):
+        status, payload = invoke({
+            "items": [{"sku": "A", "quantity": 1, "unit_price": "5"}],
+            "discounts": [{"type": "AMOUNT", "value": "10"}],
+        })
+        self.assertEqual(status, 200)
+        self.assertEqual(amounts(payload), {
+            "subtotal": "5.00", "discount": "5.00", "shipping": "0.00",
+            "tax": "0.00", "total": "0.00",
+        })
+
+
+@unittest.skipIf(msgspec is None, "msgspec not installed")
+class MsgspecFastPathTest(unittest.TestCase):
+    """parse_order must match validate_items whichever path it takes."""
+
+    ORDER = {
+        "items": [
+            {"sku": " A-1 ", "quantity": 2, "unit_price": 19.99},
+            {"sku": "B-2", "quantity": 0, "unit_price": 5},
+        ],
+        "currency": "EUR",
+        "shipping": {"mode": "FLAT", "rate": "4.50"},
+    }
+
+    def parse(self, event):
+        with mock.patch.object(
+            lambda_cost_calc, "validate_items", wraps=lambda_cost_calc.validate_items
+        ) as spy:
+            body, items = parse_order(event)
+        return body, items, spy.called
+
+    def expected_items(self, order):
+        return lambda_cost_calc.validate_items(order["items"])
+
+    def test_string_body_takes_fast_path(self):
+        body, items, fell_back = self.parse({"body": json.dumps(self.ORDER)})
+        self.assertFalse(fell_back)
+        self.assertEqual(items, self.expected_items(self.ORDER))
+        self.assertEqual(items[0], {"sku": "A-1", "quantity": 2, "unit_price": 1999})
+        self.assertEqual(body["currency"], "EUR")
+        self.assertEqual(body["shipping"], {"mode": "FLAT", "rate": "4.50"})
+        self.assertIsNone(body["tax"])
+
+    def test_direct_invoke_dict_takes_fast_path(self):
+        body, items, fell_back = self.parse(dict(self.ORDER))
+        self.assertFalse(fell_back)
+        self.assertEqual(items, self.expected_items(self.ORDER))
+        self.assertEqual(body["currency"], "EUR")
+
+    def test_blank_sku_falls_back_and_is_rejected(self):
+        for sku in ("", "   "):
+            order = {"items": [{"sku": sku, "quantity": 1, "unit_price": 1}]}
+            with self.subTest(sku=sku):
+                with mock.patch.object(
+                    lambda_cost_calc, "validate_items", wraps=lambda_cost_calc.validate_items
+                ) as spy:
+                    with self.assertRaisesRegex(BadRequest, "missing valid 'sku'"):
+                        parse_order({"body": json.dumps(order)})
+                self.assertTrue(spy.called)
+
+    def test_lenient_values_fall_back(self):
+        cases = [
+            ({"sku": "A", "quantity": 2, "unit_price": "1.005"}, 2, 101),
+            ({"sku": "A", "quantity": 3.7, "unit_price": 2}, 3, 200),
+        ]
+        for item, qty, price in cases:
+            with self.subTest(item=item):
+                body, items, fell_back = self.parse({"body": json.dumps({"items": [item]})})
+                self.assertTrue(fell_back)
+                self.assertEqual(items, [{"sku": "A", "quantity": qty, "unit_price": price}])
+                status, payload = invoke({"items": [item]})
+                self.assertEqual(status, 200)
+                self.assertEqual(payload["subtotal"], fmt(qty * price))
+
+class LargeExponentTest(unittest.TestCase):
+    def assert_rejected_quickly(self, body):
+        start = time.perf_counter()
+        status, payload = invoke(body)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(status, 400)
+        self.assertIn("Invalid numeric value", payload["error"])
+
+    def test_huge_unit_price(self):
+        self.assert_rejected_quickly(
+            {"items": [{"sku": "A", "quantity": 1, "unit_price": "1e2000000"}]}
+        )
+
+    def test_tiny_tax_rate_is_fast(self):
+        start = time.perf_counter()
+        status, payload = invoke({
+            "items": [{"sku": "A", "quantity": 1, "unit_price": 1}],
+            "tax": {"rate_percent": "1e-20000000"},
+        })
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["tax"], "0.00")
+
+    def test_huge_discount(self):
+        self.assert_rejected_quickly({
+            "items": [{"sku": "A", "quantity": 1, "unit_price": 1}],
+            "discounts": [{"type": "PERCENT", "value": "1e999999"}],
+        })
+
+    def test_small_exponents_still_parse(self):
+        self.assertEqual(Fraction(*ratio("1e2")), 100)
+        self.assertEqual(Fraction(*ratio("1e-05")), Fraction(1, 100000))
+        self.assertEqual(Fraction(*ratio("3.5e0 ")), Fraction(7, 2))
+
+    def test_tiny_exponents_round_to_zero(self):
+        self.assertEqual(ratio("1e-40"), (0, 1))
+        self.assertEqual(ratio(1e-35), (0, 1))
+        status, payload = invoke({
+            "items": [{"sku": "A", "quantity": 1, "unit_price": 1e-40}],
+            "tax": {"rate_percent": 1e-35},
+        })
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["subtotal"], "0.00")
+        self.assertEqual(payload["tax"], "0.00")
+
+    def test_tiny_negative_price_still_rejected(self):
+        status, payload = invoke({"items": [{"sku": "A", "quantity": 1, "unit_price": -1e-40}]})
+        self.assertEqual(status, 400)
+        self.assertIn("'unit_price' must be >= 0", payload["error"])
+
+    def test_non_numeric_rejected(self):
+        for val in ("nan", "Infinity", "1/2", "abc"):
+            with self.assertRaises(BadRequest):
+                ratio(val)
+
+
+class StdlibFallbackTest(unittest.TestCase):
+    def test_quantity_above_64_bits(self):
+        status, payload = invoke(
+            {"items": [{"sku": "A", "quantity": "100000000000000000000", "unit_price": 1}]}
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["line_items"][0]["quantity"], 10 ** 20)
+        self.assertEqual(payload["total"], "100000000000000000000.00")
+
+    def test_big_integer_literal_in_body(self):
+        resp = lambda_handler(
+            {"body": '{"items":[{"sku":"A","quantity":100000000000000000000,"unit_price":1}]}'},
+            None,
+        )
+        self.assertEqual(resp["statusCode"], 200)
+
+    def test_lone_surrogate_currency(self):
+        status, payload = invoke(
+            {"currency": "\ud800", "items": [{"sku": "A", "quantity": 1, "unit_price": 1}]}
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["currency"], "\ud800")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,31 @@
 """
 HW7 Load Testing - Flash Sale Simulation
 Tests synchronous vs asynchronous order processing
+
+Pick the scenario with the SCENARIO environment variable:
+    sync         normal operations against /orders/sync (default)
+    async        normal operations against /orders/async
+    flash-sync   Phase 2: flash sale with sync processing (will fail)
+    flash-async  Phase 3: flash sale with async processing (will succeed)
+
+    SCENARIO=flash-async locust -f locustfile.py --host http://localhost:8080
+
+Latency is exported as a Prometheus textfile (PROM_TEXTFILE, default
+/tmp/locust.prom) when the test stops. Each process writes its own file:
+distributed workers write <name>.worker<N>.prom and the master writes
+nothing, so aggregate the per-worker files (e.g. node_exporter's textfile
+collector or a sum in PromQL) rather than expecting one combined file.
 """
 
-from locust import HttpUser, FastHttpUser, task, between, events
+from locust import FastHttpUser, task, between, events
+from locust.runners import MasterRunner, WorkerRunner
+from locust_plugins.connection_pools import FastHttpPool
+from geventhttpclient.client import HTTPClientPool
+from prometheus_client import CollectorRegistry, Histogram, write_to_textfile
+import itertools
+import os
 import random
+import socket
 import json
 import time
 from datetime import datetime
@@ -17,96 +38,142 @@ PRODUCTS = [
     {"product_id": "FLASH-003", "quantity": 1, "price": 99.99},
 ]
 
-class SyncOrderUser(HttpUser):
-    """Normal operations with synchronous processing"""
-    wait_time = between(0.1, 0.5)
-    
-    @task
-    def place_sync_order(self):
-        order = {
-            "customer_id": random.choice(CUSTOMER_IDS),
-            "items": random.sample(PRODUCTS, k=random.randint(1, 2))
-        }
-        
-        with self.client.post(
-            "/orders/sync",
-            json=order,
-            catch_response=True,
-            timeout=10
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Status {response.status_code}")
 
+def order_templates(k):
+    """JSON bodies for every ordered pick of k products, with %d for customer_id"""
+    return [
+        json.dumps({"customer_id": 0, "items": list(items)})
+        .encode()
+        .replace(b'"customer_id": 0', b'"customer_id": %d')
+        for items in itertools.permutations(PRODUCTS, k)
+    ]
 
-class AsyncOrderUser(HttpUser):
-    """Flash sale with asynchronous processing"""
-    wait_time = between(0.1, 0.5)
-    
-    @task
-    def place_async_order(self):
-        order = {
-            "customer_id": random.choice(CUSTOMER_IDS),
-            "items": random.sample(PRODUCTS, k=random.randint(1, 2))
-        }
-        
-        with self.client.post(
-            "/orders/async",
-            json=order,
-            catch_response=True,
-            timeout=2
-        ) as response:
-            if response.status_code == 202:
-                response.success()
-            else:
-                response.failure(f"Status {response.status_code}")
 
+# Pre-encoded order bodies so tasks only splice in a customer id
+ONE_ITEM_ORDERS = order_templates(1)
+# Half one-item, half two-item orders, like random.sample(PRODUCTS, k=randint(1, 2))
+MIXED_ORDERS = ONE_ITEM_ORDERS * 2 + order_templates(2)
+JSON_HEADERS = {"Content-Type": "application/json"}
 
-class FlashSaleSync(FastHttpUser):
-    """Phase 2: Flash sale with sync processing (will fail)"""
-    wait_time = between(0.1, 0.3)
-    
-    @task
-    def flash_order(self):
-        order = {
-            "customer_id": random.choice(CUSTOMER_IDS),
-            "items": [random.choice(PRODUCTS)]
-        }
-        
-        with self.client.post(
-            "/orders/sync",
-            json=order,
-            catch_response=True,
-            timeout=10
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Failed: {response.status_code}")
+# name: (endpoint, expected status, timeout in seconds, order bodies, wait time bounds)
+SCENARIOS = {
+    "sync": ("/orders/sync", 200, 10, MIXED_ORDERS, (0.1, 0.5)),
+    "async": ("/orders/async", 202, 2, MIXED_ORDERS, (0.1, 0.5)),
+    "flash-sync": ("/orders/sync", 200, 10, ONE_ITEM_ORDERS, (0.1, 0.3)),
+    "flash-async": ("/orders/async", 202, 2, ONE_ITEM_ORDERS, (0.1, 0.3)),
+}
+SCENARIO = os.environ.get("SCENARIO", "sync")
+if SCENARIO not in SCENARIOS:
+    raise ValueError(f"Unknown SCENARIO {SCENARIO!r}, expected one of {', '.join(SCENARIOS)}")
+ENDPOINT, EXPECTED_STATUS, TIMEOUT, ORDERS, WAIT = SCENARIOS[SCENARIO]
+
+# Latency histogram (ms buckets), exported once at test stop as a Prometheus textfile
+BINS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+PROM_TEXTFILE = os.environ.get("PROM_TEXTFILE", "/tmp/locust.prom")
+REGISTRY = CollectorRegistry()
+ORDER_LATENCY = Histogram(
+    "order_latency_ms", "Order request latency in milliseconds",
+    ["scenario", "status"], buckets=BINS, registry=REGISTRY,
+)
+
+
+# Kept identical in Part1/locustfile.py and testing/locustfile.py
+def prom_textfile_path(runner):
+    """Per-process textfile path, or None on a master (it holds no samples).
 
+    Workers append their index so processes sharing a host don't overwrite
+    each other; a standalone run writes PROM_TEXTFILE itself.
+    """
+    if isinstance(runner, MasterRunner):
+        return None
+    if isinstance(runner, WorkerRunner):
+        root, ext = os.path.splitext(PROM_TEXTFILE)
+        return f"{root}.worker{runner.worker_index}{ext}"
+    return PROM_TEXTFILE
+
+
+# Connection helpers below are kept identical in Part1/locustfile.py and
+# testing/locustfile.py (each locustfile runs standalone from its own
+# directory); change both together.
+
+
+def set_socket_options(sock):
+    """Disable Nagle so small order POSTs aren't held back by delayed ACKs"""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+
+class NoDelayClientPool(HTTPClientPool):
+    """HTTPClientPool whose connections are opened with TCP_NODELAY"""
+
+    def get_client(self, url):
+        client = super().get_client(url)
+        # Clients are cached per host:port; install the hook only when the
+        # client is new (after_connect is still the class method)
+        connections = client._connection_pool
+        if "after_connect" not in vars(connections):
+            connections.after_connect = set_socket_options
+        return client
+
+
+def pooled_client(user):
+    """FastHttpPool of TCP_NODELAY sessions for one user.
+
+    The pool does not add concurrency: a user runs its tasks one at a time,
+    so it just rotates requests round-robin over --pool_size / POOL_SIZE
+    connections (a locust_plugins option, defaulted to 8 below). That spreads one user's traffic
+    over more source ports, e.g. across load balancer targets, at the cost of
+    holding more sockets open.
+
+    Relies on FastHttpPool._pool (locust-plugins 5.x) and on the user
+    agent's clientpool attribute (geventhttpclient 2.x), neither of which
+    is public API.
+    """
+    pool = FastHttpPool(user=user)
+    for session in pool._pool:
+        agent = session.client
+        agent.clientpool = NoDelayClientPool(**agent.clientpool.client_args)
+    return pool
+
+
+@events.init_command_line_parser.add_listener
+def default_pool_size(parser):
+    # Runs after locust_plugins adds --pool_size; the flag and env var still win.
+    parser.set_defaults(pool_size=8)
+
+
+class OrderFlashUser(FastHttpUser):
+    """Places orders for the configured SCENARIO.
+
+    Requests are spread over a pool of TCP_NODELAY connections. For the sync
+    scenarios the client's own success detection is enough (non-2xx and
+    timeouts fail); the async scenarios must also fail any status other than
+    202, so that a synchronous 200 from /orders/async is not a success.
+    """
+    wait_time = between(*WAIT)
+    network_timeout = TIMEOUT
+    connection_timeout = TIMEOUT
+
+    def on_start(self):
+        self.client = pooled_client(self)
 
-class FlashSaleAsync(FastHttpUser):
-    """Phase 3: Flash sale with async processing (will succeed)"""
-    wait_time = between(0.1, 0.3)
-    
     @task
-    def flash_order(self):
-        order = {
-            "customer_id": random.choice(CUSTOMER_IDS),
-            "items": [random.choice(PRODUCTS)]
-        }
-        
+    def place_order(self):
+        body = random.choice(ORDERS) % random.choice(CUSTOMER_IDS)
+        if EXPECTED_STATUS == 200:
+            self.client.post(ENDPOINT, data=body, headers=JSON_HEADERS)
+            return
+
         with self.client.post(
-            "/orders/async",
-            json=order,
-            catch_response=True,
-            timeout=2
+            ENDPOINT,
+            data=body,
+            headers=JSON_HEADERS,
+            catch_response=True
         ) as response:
-            if response.status_code == 202:
+            if response.status_code == EXPECTED_STATUS:
                 response.success()
             else:
-                response.failure(f"Failed: {response.status_code}")
+                response.failure(f"Expected {EXPECTED_STATUS}, got {response.status_code}")
 
 
 @events.test_start.add_listener
@@ -114,19 +181,20 @@ def on_test_start(environment, **kwargs):
     print("=" * 60)
     print("FLASH SALE LOAD TEST STARTING")
     print(f"Host: {environment.host}")
+    print(f"Scenario: {SCENARIO} ({ENDPOINT})")
     print("=" * 60)
 
 
+@events.request.add_listener
+def on_request(response_time, response=None, **kwargs):
+    status = getattr(response, "status_code", 0) or "error"
+    ORDER_LATENCY.labels(scenario=SCENARIO, status=status).observe(response_time)
+
+
 @events.test_stop.add_listener
 def on_test_stop(environment, **kwargs):
-    print("=" * 60)
-    print("TEST COMPLETED")
-    stats = environment.stats
-    
-    if stats.total.num_requests > 0:
-        print(f"Total Requests: {stats.total.num_requests}")
-        print(f"Total Failures: {stats.total.num_failures}")
-        print(f"Failure Rate: {(stats.total.num_failures/stats.total.num_requests)*100:.2f}%")
-        print(f"Median Response: {stats.total.median_response_time}ms")
-        print(f"95th Percentile: {stats.total.get_response_time_percentile(0.95)}ms")
-    print("=" * 60)
\ No newline at end of file
+    path = prom_textfile_path(environment.runner)
+    if path is None:
+        return
+    write_to_textfile(path, REGISTRY)
+    print(f"TEST COMPLETED - latency histogram written to {path}")